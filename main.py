@@ -6,19 +6,52 @@ Calibre批量元数据修改插件 - 主功能模块
 """
 
 import sys
+import logging
+from dataclasses import dataclass
 from PyQt5.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
     QComboBox, QCheckBox, QPushButton, QGroupBox, QListWidget,
-    QListWidgetItem, QMessageBox, QTableWidget,
-    QTableWidgetItem, QAbstractItemView, QSizePolicy
+    QMessageBox, QTableView,
+    QAbstractItemView, QSizePolicy, QHeaderView
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QSignalBlocker
 from calibre.gui2 import error_dialog, info_dialog
 from calibre_plugins.calibre_edit_metadata.plugin import (
-    extract_base_title, get_all_authors, batch_update_metadata, 
-    detect_and_sort_books_by_volume, preview_metadata_changes
+    extract_base_title, get_all_authors, bulk_update_metadata,
+    detect_and_sort_books_by_volume, preview_metadata_changes, load_book_view
 )
 
+logger = logging.getLogger(__name__)
+
+
+def enable_debug_logging():
+    """开启调试日志，输出到标准错误"""
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter("DEBUG: %(message)s"))
+        logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG)
+
+
+def format_book_ids(book_ids):
+    """
+    生成书籍ID列表的简短显示文本
+    书籍较多时只显示首尾几个ID
+    """
+    if len(book_ids) > 8:
+        return f"{book_ids[:5]}...{book_ids[-3:]} (共 {len(book_ids)} 本)"
+    return str(book_ids)
+
+
+@dataclass
+class BookRow:
+    """书籍列表中的一行数据"""
+    __slots__ = ('id', 'title', 'authors', 'display')
+    id: int         # 书籍ID
+    title: str      # 书名
+    authors: list   # 作者列表
+    display: str    # 列表显示文本（不含序号）
+
 
 class BatchEditMetadataDialog(QDialog):
     """批量编辑元数据对话框"""
@@ -33,12 +66,18 @@ class BatchEditMetadataDialog(QDialog):
         
         # 调试模式开关
         self.debug_mode = False  # 设为 True 开启调试，False 关闭
+        if self.debug_mode:
+            enable_debug_logging()
+        
+        # 预先解析书库视图及其刷新方法，避免每次使用时重复探测
+        self.library_view = getattr(gui, 'library_view', None)
+        self.resolve_refresh_methods()
         
         # 获取选中的书籍ID
         self.book_ids = self.get_selected_book_ids()
         
-        if self.debug_mode:
-            self.debug_message(f"获取到的原始书籍ID列表: {self.book_ids}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("获取到的原始书籍ID列表: %s", format_book_ids(self.book_ids))
         
         if not self.book_ids:
             self.show_error("未选中书籍", "请先选中要修改元数据的书籍")
@@ -46,23 +85,22 @@ class BatchEditMetadataDialog(QDialog):
             return
         
         # 初始化数据结构
-        self.books_dict = {}  # key: book_id, value: metadata
-        self.book_id_to_title = {}  # key: book_id, value: title
-        self.valid_book_ids = []    # 有效的书籍ID（保持原始顺序）
-        self.books = []             # 对应的书籍元数据对象列表
-        self.titles = []            # 对应的标题列表
+        self.book_view = None       # 批量读取的书籍数据（并列列表）
+        self.rows = []              # 有效的书籍数据（BookRow，按当前顺序）
+        self.last_preview_key = None  # 上次预览的输入
+        self.last_previews = []       # 上次预览的结果
         
         # 批量获取元数据
         self.fetch_books_metadata()
         
-        if not self.books_dict:
+        if not self.book_view or not self.book_view['ids']:
             self.show_error("未获取到书籍", "无法获取任何选中书籍的元数据")
             return
         
         # 整理数据，确保ID和标题的顺序一致
         self.organize_book_data()
         
-        if not self.valid_book_ids:
+        if not self.rows:
             self.show_error("数据错误", "未能获取有效的书籍数据")
             return
         
@@ -70,12 +108,9 @@ class BatchEditMetadataDialog(QDialog):
         self.base_title = extract_base_title(self.titles)
         self.all_authors = get_all_authors(self.books)
         
-        if self.debug_mode:
-            self.debug_message(f"有效书籍数量: {len(self.valid_book_ids)}")
-            for i, (book_id, title) in enumerate(zip(self.valid_book_ids, self.titles)):
-                self.debug_message(f"书籍{i+1}: ID={book_id}, 标题={title}")
-            self.debug_message(f"提取的基础书名: {self.base_title}")
-            self.debug_message(f"提取的所有作者: {self.all_authors}")
+        logger.debug("有效书籍数量: %d", len(self.rows))
+        logger.debug("提取的基础书名: %s", self.base_title)
+        logger.debug("提取的所有作者: %s", self.all_authors)
         
         # 更新book_ids为有效的书籍ID
         self.book_ids = self.valid_book_ids
@@ -83,11 +118,31 @@ class BatchEditMetadataDialog(QDialog):
         # 初始化UI
         self.setup_ui()
     
-    def debug_message(self, message):
-        """调试信息输出"""
-        if self.debug_mode:
-            # 使用控制台输出，避免对话框干扰
-            print(f"DEBUG: {message}", file=sys.stderr)
+    @property
+    def valid_book_ids(self):
+        """有效的书籍ID列表（按当前顺序）"""
+        return [row.id for row in self.rows]
+    
+    @property
+    def books(self):
+        """对应的 (书名, 作者列表) 列表"""
+        return [(row.title, row.authors) for row in self.rows]
+    
+    @property
+    def titles(self):
+        """对应的标题列表"""
+        return [row.title for row in self.rows]
+    
+    def resolve_refresh_methods(self):
+        """
+        解析刷新书库视图所用的方法
+        兼容不同版本的Calibre，不存在的方法记为 None
+        """
+        view = self.library_view
+        model = view.model() if view is not None else None
+        self.model_refresh_ids = getattr(model, 'refresh_ids', None)
+        self.model_resort = getattr(model, 'resort', None)
+        self.view_refresh = getattr(view, 'refresh', None)
     
     def show_error(self, title, message):
         """显示错误信息"""
@@ -102,85 +157,55 @@ class BatchEditMetadataDialog(QDialog):
         
         try:
             # 方法1：使用 Calibre 的 get_selected_ids() 方法（最推荐）
-            if hasattr(self.gui, 'library_view'):
-                view = self.gui.library_view
-                selected_ids = list(view.get_selected_ids())
-                
-                if self.debug_mode:
-                    self.debug_message(f"使用 get_selected_ids() 获取到的ID: {selected_ids}")
+            if self.library_view is not None:
+                selected_ids = list(self.library_view.get_selected_ids())
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("使用 get_selected_ids() 获取到的ID: %s", format_book_ids(selected_ids))
         
         except Exception as e:
-            if self.debug_mode:
-                self.debug_message(f"获取选中ID时出错: {str(e)}")
+            logger.debug("获取选中ID时出错: %s", e)
         return selected_ids
     
     def fetch_books_metadata(self):
-        """批量获取书籍元数据"""
-        for book_id in self.book_ids:
-            try:
-                # 使用 index_is_id=True 确保正确获取元数据
-                mi = self.db.get_metadata(book_id, index_is_id=True, get_cover=False)
-                
-                if mi and hasattr(mi, 'title') and mi.title:
-                    self.books_dict[book_id] = mi
-                    self.book_id_to_title[book_id] = mi.title
-                    
-                    if self.debug_mode:
-                        self.debug_message(f"成功获取: ID={book_id}, 标题={mi.title}")
-                else:
-                    if self.debug_mode:
-                        self.debug_message(f"获取失败: ID={book_id}, 元数据为空")
-                        
-            except Exception as e:
-                if self.debug_mode:
-                    self.debug_message(f"错误: ID={book_id}, 异常={str(e)}")
+        """
+        批量获取书籍元数据
+        使用 new_api 按字段一次性读取书名和作者，避免逐本构建完整元数据
+        """
+        try:
+            self.book_view = load_book_view(self.db, self.book_ids)
+        except Exception as e:
+            logger.debug("批量读取元数据出错: %s", e)
+            return
+        
+        logger.debug("成功获取 %d/%d 本书的元数据",
+                     len(self.book_view['ids']), len(self.book_ids))
     
     def organize_book_data(self):
         """
-        整理书籍数据，确保ID、元数据和标题的顺序一致
+        整理书籍数据，按卷号顺序生成书籍行
         """
-        # 使用现成的排序函数按卷号排序书籍
-        sorted_books = detect_and_sort_books_by_volume(self.db, self.book_ids)
+        view = self.book_view
         
-        # 将排序后的数据添加到正式列表
-        for book_id, _ in sorted_books:
-            if book_id in self.books_dict:
-                mi = self.books_dict[book_id]
-                title = self.book_id_to_title[book_id]
-                self.valid_book_ids.append(book_id)
-                self.books.append(mi)
-                self.titles.append(title)
+        # 使用已读取的卷号排序书籍，无需再次查询数据库
+        order = detect_and_sort_books_by_volume(view)
         
-        # 验证数据一致性
-        if self.debug_mode:
-            self.debug_message(f"数据统计 - IDs: {len(self.valid_book_ids)}, "
-                             f"Books: {len(self.books)}, Titles: {len(self.titles)}")
+        # 将排序后的数据添加到正式列表，同时预先生成显示文本
+        for index in order:
+            title = view['titles'][index]
+            authors = view['authors'][index]
+            display = f"{title} - {'、'.join(authors or ('未知作者',))}"
+            self.rows.append(BookRow(view['ids'][index], title, authors, display))
         
-        # 确保三个列表长度一致
-        if len(self.valid_book_ids) != len(self.books) or len(self.books) != len(self.titles):
-            if self.debug_mode:
-                self.debug_message("警告: 数据长度不一致，进行清理...")
-            
-            # 取最小长度，确保数据一致
-            min_len = min(len(self.valid_book_ids), len(self.books), len(self.titles))
-            
-            if min_len == 0:
-                if self.debug_mode:
-                    self.debug_message("错误: 没有有效的数据")
-                return
-            
-            self.valid_book_ids = self.valid_book_ids[:min_len]
-            self.books = self.books[:min_len]
-            self.titles = self.titles[:min_len]
-            
-            if self.debug_mode:
-                self.debug_message(f"清理后数据长度: {min_len}")
+        logger.debug("数据统计 - 有效书籍: %d", len(self.rows))
     
     def setup_ui(self):
         """设置UI界面"""
         self.setWindowTitle("批量元数据修改")
         self.setMinimumWidth(500)
         
+        # 初始化期间屏蔽控件信号，函数结束时自动恢复
+        blockers = []
+        
         # 主布局
         main_layout = QVBoxLayout(self)
         
@@ -193,6 +218,7 @@ class BatchEditMetadataDialog(QDialog):
         
         # 书籍列表
         self.books_list = QListWidget()
+        blockers.append(QSignalBlocker(self.books_list))
         # 设置选择模式为单选，方便移动
         self.books_list.setSelectionMode(QListWidget.SingleSelection)
         
@@ -241,9 +267,9 @@ class BatchEditMetadataDialog(QDialog):
         author_row = QHBoxLayout()
         author_row.addWidget(QLabel("统一作者:"))
         self.author_combo = QComboBox()
-        self.author_combo.addItem("", "")  # 空选项
-        for author in self.all_authors:
-            self.author_combo.addItem(author, author)
+        blockers.append(QSignalBlocker(self.author_combo))
+        # 一次性添加全部选项（首项为空选项）
+        self.author_combo.addItems([""] + self.all_authors)
         # 允许编辑
         self.author_combo.setEditable(True)
         author_row.addWidget(self.author_combo)
@@ -256,16 +282,19 @@ class BatchEditMetadataDialog(QDialog):
         
         # 清空标签
         self.clear_tags_check = QCheckBox("清空标签")
+        blockers.append(QSignalBlocker(self.clear_tags_check))
         self.clear_tags_check.setChecked(True)
         clear_layout.addWidget(self.clear_tags_check)
         
         # 清空丛书
         self.clear_series_check = QCheckBox("清空丛书")
+        blockers.append(QSignalBlocker(self.clear_series_check))
         self.clear_series_check.setChecked(True)
         clear_layout.addWidget(self.clear_series_check)
         
         # 清空出版方
         self.clear_publisher_check = QCheckBox("清空出版方")
+        blockers.append(QSignalBlocker(self.clear_publisher_check))
         self.clear_publisher_check.setChecked(True)
         clear_layout.addWidget(self.clear_publisher_check)
         
@@ -295,7 +324,7 @@ class BatchEditMetadataDialog(QDialog):
         
         # 在调试模式下显示书籍ID信息
         if self.debug_mode:
-            debug_label = QLabel(f"书籍ID: {self.book_ids}")
+            debug_label = QLabel(f"书籍ID: {format_book_ids(self.book_ids)}")
             debug_label.setStyleSheet("color: gray; font-size: 10px;")
             main_layout.addWidget(debug_label)
     
@@ -303,17 +332,34 @@ class BatchEditMetadataDialog(QDialog):
         """
         刷新书籍列表显示
         """
-        self.books_list.clear()
-        for i, mi in enumerate(self.books):
-            # 显示编号，便于确认顺序
-            title = mi.title if hasattr(mi, 'title') else f"未知标题"
-            authors = '、'.join(mi.authors) if hasattr(mi, 'authors') and mi.authors else "未知作者"
-            item_text = f"{i+1}. {title} - {authors}"
-            if self.debug_mode:
-                item_text += f" (ID: {self.valid_book_ids[i]})"
-            
-            item = QListWidgetItem(item_text)
-            self.books_list.addItem(item)
+        if not self.rows:
+            self.books_list.clear()
+            return
+        
+        # 先生成全部显示文本，再一次性添加，避免逐项触发布局刷新
+        item_texts = [self.format_book_row(i) for i in range(len(self.rows))]
+        
+        self.books_list.setUpdatesEnabled(False)
+        blocker = QSignalBlocker(self.books_list)
+        try:
+            self.books_list.clear()
+            self.books_list.addItems(item_texts)
+        finally:
+            blocker.unblock()
+            self.books_list.setUpdatesEnabled(True)
+    
+    def format_book_row(self, index):
+        """
+        生成书籍列表中某一行的显示文本
+        :param index: 行索引
+        :return: 显示文本
+        """
+        # 显示编号，便于确认顺序
+        row = self.rows[index]
+        item_text = f"{index+1}. {row.display}"
+        if self.debug_mode:
+            item_text += f" (ID: {row.id})"
+        return item_text
     
     def move_book_up(self):
         """
@@ -331,7 +377,9 @@ class BatchEditMetadataDialog(QDialog):
         下移选中的书籍
         """
         current_row = self.books_list.currentRow()
-        if current_row < len(self.books) - 1:
+        if current_row < 0:
+            return
+        if current_row < len(self.rows) - 1:
             # 移动书籍数据
             self.swap_book_items(current_row, current_row + 1)
             # 更新列表选择
@@ -343,23 +391,18 @@ class BatchEditMetadataDialog(QDialog):
         :param index1: 第一个位置索引
         :param index2: 第二个位置索引
         """
-        # 交换 valid_book_ids 列表
-        self.valid_book_ids[index1], self.valid_book_ids[index2] = self.valid_book_ids[index2], self.valid_book_ids[index1]
-        
-        # 交换 books 列表
-        self.books[index1], self.books[index2] = self.books[index2], self.books[index1]
-        
-        # 交换 titles 列表
-        self.titles[index1], self.titles[index2] = self.titles[index2], self.titles[index1]
+        # 先校验索引，避免只交换了数据却无法更新列表显示
+        valid_range = range(len(self.rows))
+        if index1 == index2 or index1 not in valid_range or index2 not in valid_range:
+            return
         
-        # 交换 books_dict 中的顺序？不，books_dict 是按 ID 索引的，不需要交换
+        self.rows[index1], self.rows[index2] = self.rows[index2], self.rows[index1]
         
-        # 刷新列表显示
-        self.refresh_books_list()
+        # 只更新被交换的两行，无需重建整个列表
+        self.books_list.item(index1).setText(self.format_book_row(index1))
+        self.books_list.item(index2).setText(self.format_book_row(index2))
         
-        if self.debug_mode:
-            self.debug_message(f"书籍顺序调整: {index1+1} ↔ {index2+1}")
-            self.debug_message(f"调整后的书籍ID列表: {self.valid_book_ids}")
+        logger.debug("书籍顺序调整: %d ↔ %d", index1 + 1, index2 + 1)
     
     def accept(self):
         """
@@ -368,13 +411,6 @@ class BatchEditMetadataDialog(QDialog):
         # 更新 book_ids 为调整后的顺序
         self.book_ids = self.valid_book_ids
         
-        # 在执行前验证数据一致性
-        if len(self.book_ids) != len(self.books):
-            error_dialog(self.gui, "数据错误", 
-                        f"书籍ID数量({len(self.book_ids)})与元数据数量({len(self.books)})不匹配",
-                        show=True)
-            return
-        
         # 获取用户输入
         new_title_base = self.title_edit.text().strip()
         author = self.author_combo.currentText().strip()
@@ -396,21 +432,14 @@ class BatchEditMetadataDialog(QDialog):
                 return
         
         try:
-            # 在调试模式下显示详细信息
-            if self.debug_mode:
-                print(f"\n=== 开始批量更新 ===", file=sys.stderr)
-                print(f"书名模板: {new_title_base}", file=sys.stderr)
-                print(f"作者: {author}", file=sys.stderr)
-                print(f"清空选项: tags={clear_tags}, series={clear_series}, publisher={clear_publisher}", file=sys.stderr)
-                print(f"书籍ID列表: {self.book_ids}", file=sys.stderr)
-                
-                # 验证每个ID对应的标题
-                for i, (book_id, book) in enumerate(zip(self.book_ids, self.books)):
-                    print(f"书籍{i+1}: ID={book_id}, 原标题={book.title}, "
-                          f"新标题={new_title_base}{' ' + str(i+1) if i > 0 else ''}", file=sys.stderr)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("开始批量更新: 书名模板=%s, 作者=%s", new_title_base, author)
+                logger.debug("清空选项: tags=%s, series=%s, publisher=%s",
+                             clear_tags, clear_series, clear_publisher)
+                logger.debug("书籍ID列表: %s", format_book_ids(self.book_ids))
             
             # 执行批量更新
-            updated_count = batch_update_metadata(
+            updated_count = bulk_update_metadata(
                 self.db,
                 self.book_ids,
                 new_title_base,
@@ -449,16 +478,23 @@ class BatchEditMetadataDialog(QDialog):
             # 获取当前选中的书籍ID（已排序）
             book_ids = self.valid_book_ids
             
-            # 调用预览函数
-            previews = preview_metadata_changes(self.db, book_ids, new_title_base, author)
+            # 输入和顺序都未变化时直接复用上次的预览结果
+            preview_key = (tuple(book_ids), new_title_base, author)
+            if preview_key != self.last_preview_key:
+                # 调用预览函数，复用已读取的元数据，避免再次查询数据库
+                self.last_previews = preview_metadata_changes(
+                    self.db, book_ids, new_title_base, author,
+                    cached_metadata={row.id: (row.title, row.authors) for row in self.rows}
+                )
+                self.last_preview_key = preview_key
+            previews = self.last_previews
             
             # 显示预览窗口
             preview_window = PreviewWindow(self, previews)
             preview_window.exec_()
             
         except Exception as e:
-            if self.debug_mode:
-                self.debug_message(f"预览时出错: {e}")
+            logger.debug("预览时出错: %s", e)
             error_dialog(self.gui, "预览失败", f"生成预览时出错: {str(e)}", show=True)
     
     def refresh_gui(self):
@@ -467,55 +503,117 @@ class BatchEditMetadataDialog(QDialog):
         兼容不同版本的Calibre
         """
         try:
-            # 方法1：使用 refresh_ids 刷新特定书籍
-            if hasattr(self.gui.library_view.model(), 'refresh_ids'):
-                self.gui.library_view.model().refresh_ids(self.book_ids)
-            
-            # 方法2：刷新当前视图
-            if hasattr(self.gui.library_view, 'refresh'):
-                self.gui.library_view.refresh()
-            
-            # 方法3：刷新整个视图模型
-            if hasattr(self.gui.library_view.model(), 'resort'):
-                self.gui.library_view.model().resort()
-            
-            # 方法4：如果有选择模型，保持选择
-            if hasattr(self.gui.library_view, 'selectionModel'):
-                # 重新选择相同的书籍（如果需要）
-                # 这里可以选择不进行任何操作，因为用户可能不需要保持选择
-                pass
+            if self.model_refresh_ids is not None:
+                # 只刷新修改过的书籍，模型会自行通知视图更新
+                self.model_refresh_ids(self.book_ids)
+            else:
+                # 旧版本没有 refresh_ids，退回到刷新整个视图
+                if self.view_refresh is not None:
+                    self.view_refresh()
+                if self.model_resort is not None:
+                    self.model_resort()
             
-            if self.debug_mode:
-                self.debug_message("GUI刷新完成")
+            logger.debug("GUI刷新完成")
                 
         except Exception as e:
-            if self.debug_mode:
-                self.debug_message(f"刷新GUI时出错: {e}")
+            logger.debug("刷新GUI时出错: %s", e)
             # 不抛出异常，因为元数据已经更新成功
             info_dialog(self.gui, "调试信息", f"刷新GUI时出错: {e}", show=True)
 
 
+# 预览表格模型
+class PreviewModel(QAbstractTableModel):
+    """
+    预览数据模型
+    直接持有预览结果列表，仅在视图请求可见单元格时生成显示文本
+    """
+    HEADERS = ("序号", "原书名", "原作者", "新书名", "新作者")
+    
+    def __init__(self, previews, parent=None):
+        super().__init__(parent)
+        self.rows = previews
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal:
+            if role == Qt.DisplayRole:
+                return self.HEADERS[section]
+            if role == Qt.TextAlignmentRole:
+                return Qt.AlignCenter
+        return super().headerData(section, orientation, role)
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        # 所有单元格居中对齐
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        if role != Qt.DisplayRole:
+            return None
+        return self.display_text(index.row(), index.column())
+    
+    def display_text(self, row, column):
+        """
+        获取单元格的显示文本
+        :param row: 行索引
+        :param column: 列索引
+        :return: 显示文本
+        """
+        preview = self.rows[row]
+        if column == 0:
+            return str(row + 1)
+        if column == 1:
+            return preview.get('old_title', '')
+        if column == 2:
+            return '、'.join(preview.get('old_authors', []))
+        if column == 3:
+            return preview.get('new_title', '')
+        if column == 4:
+            return preview.get('new_author', '')
+        return None
+
+
 # 预览窗口类
 class PreviewWindow(QDialog):
+    # 超过该行数时只测量首尾部分行来计算列宽
+    MEASURE_ALL_ROWS_LIMIT = 500
+    MEASURE_HEAD_ROWS = 200
+    MEASURE_TAIL_ROWS = 100
+    # 最小高度最多按该行数计算
+    MAX_MIN_HEIGHT_ROWS = 20
+    
     def __init__(self, parent, previews):
         super().__init__(parent)
         self.previews = previews
         self.setWindowTitle("元数据修改预览")
         # 移除固定最小宽度，让窗口完全自适应
         self.setMinimumHeight(400)
+        # 列宽计算等耗时操作推迟到窗口首次显示时进行
+        self.window_sized = False
         self.setup_ui()
     
+    def showEvent(self, event):
+        """首次显示时再计算列宽和窗口大小"""
+        if not self.window_sized:
+            self.window_sized = True
+            self.adjust_window_size()
+        super().showEvent(event)
+    
     def setup_ui(self):
         """
         设置预览窗口UI
         """
         main_layout = QVBoxLayout(self)
         
-        # 预览表格
-        self.table = QTableWidget()
-        self.table.setRowCount(len(self.previews))
-        self.table.setColumnCount(5)
-        self.table.setHorizontalHeaderLabels(["序号", "原书名", "原作者", "新书名", "新作者"])
+        # 预览表格（模型/视图，避免逐格创建 QTableWidgetItem）
+        self.table = QTableView()
+        self.model = PreviewModel(self.previews, self)
+        self.table.setModel(self.model)
         
         # 设置表格属性
         self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
@@ -524,43 +622,6 @@ class PreviewWindow(QDialog):
         # 设置表格大小策略
         self.table.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         
-        # 设置列对齐方式
-        # 原书名（第1列）和新书名（第3列）居中显示
-        for column in [1, 3]:
-            header = self.table.horizontalHeaderItem(column)
-            header.setTextAlignment(Qt.AlignCenter)
-        
-        # 填充数据
-        for i, preview in enumerate(self.previews):
-            # 序号 - 居中对齐
-            item = QTableWidgetItem(str(i+1))
-            item.setTextAlignment(Qt.AlignCenter)
-            self.table.setItem(i, 0, item)
-            
-            # 原书名 - 居中对齐
-            old_title = preview.get('old_title', '')
-            item = QTableWidgetItem(old_title)
-            item.setTextAlignment(Qt.AlignCenter)
-            self.table.setItem(i, 1, item)
-            
-            # 原作者 - 居中对齐
-            old_authors = '、'.join(preview.get('old_authors', []))
-            item = QTableWidgetItem(old_authors)
-            item.setTextAlignment(Qt.AlignCenter)
-            self.table.setItem(i, 2, item)
-            
-            # 新书名 - 居中对齐
-            new_title = preview.get('new_title', '')
-            item = QTableWidgetItem(new_title)
-            item.setTextAlignment(Qt.AlignCenter)
-            self.table.setItem(i, 3, item)
-            
-            # 新作者 - 居中对齐
-            new_author = preview.get('new_author', '')
-            item = QTableWidgetItem(new_author)
-            item.setTextAlignment(Qt.AlignCenter)
-            self.table.setItem(i, 4, item)
-        
         # 添加到布局
         main_layout.addWidget(self.table)
         
@@ -573,35 +634,39 @@ class PreviewWindow(QDialog):
         
         main_layout.addLayout(button_layout)
         
-        # 设置窗口最小高度
-        min_height = max(400, 30 + len(self.previews) * 25)  # 根据行数调整最小高度
+        # 设置窗口最小高度，根据行数调整，但行数很多时不再继续增大
+        visible_rows = min(len(self.previews), self.MAX_MIN_HEIGHT_ROWS)
+        min_height = max(400, 30 + visible_rows * 25)
         self.setMinimumHeight(min_height)
-        
-        # 计算并设置合适的窗口大小
-        self.adjust_window_size()
     
     def adjust_window_size(self):
         """
         调整窗口大小以适应内容
         """
-        # 先让表格调整列宽
-        self.table.resizeColumnsToContents()
+        column_count = self.model.columnCount()
+        row_count = self.model.rowCount()
+        
+        # 直接按文本宽度计算列宽，避免 resizeColumnsToContents 逐格测量渲染
+        fm = self.table.fontMetrics()
+        header_fm = self.table.horizontalHeader().fontMetrics()
+        # 每列增加留白（含单元格边距），避免内容挤在一起
+        padding = 30
+        # 行数很多时只测量首尾部分行，表格本身按需取数据，无需分页
+        if row_count > self.MEASURE_ALL_ROWS_LIMIT:
+            measured_rows = list(range(self.MEASURE_HEAD_ROWS))
+            measured_rows += range(row_count - self.MEASURE_TAIL_ROWS, row_count)
+        else:
+            measured_rows = range(row_count)
+        for i in range(column_count):
+            width = header_fm.horizontalAdvance(self.model.HEADERS[i])
+            for row in measured_rows:
+                width = max(width, fm.horizontalAdvance(self.model.display_text(row, i)))
+            self.table.setColumnWidth(i, width + padding)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
         
         # 计算表格的总宽度（包括列宽）
         total_width = 0
-        for i in range(self.table.columnCount()):
-            total_width += self.table.columnWidth(i)
-        
-        # 为每一列增加少量留白，避免内容挤在一起
-        padding = 10  # 每列增加10px的留白
-        for i in range(self.table.columnCount()):
-            current_width = self.table.columnWidth(i)
-            new_width = current_width + padding
-            self.table.setColumnWidth(i, new_width)
-        
-        # 重新计算总宽度
-        total_width = 0
-        for i in range(self.table.columnCount()):
+        for i in range(column_count):
             total_width += self.table.columnWidth(i)
         
         # 添加表格边框和窗口边框的宽度
@@ -621,7 +686,7 @@ class PreviewWindow(QDialog):
         window_height = header_height + (len(self.previews) * row_height) + button_height + 40
         
         # 确保高度在合理范围内
-        min_height = max(400, 30 + len(self.previews) * 25)
+        min_height = self.minimumHeight()
         max_height = int(screen_geometry.height() * 0.8)
         final_height = min(max(min_height, window_height), max_height)
         
@@ -6,10 +6,8 @@ Calibre批量元数据修改插件 - 核心功能模块
 """
 
 import re
-import os
-from collections import Counter
+from functools import lru_cache
 from typing import List, Dict, Tuple, Optional
-import math
 
 # 中文数字映射（扩展版）
 CHINESE_NUMBERS = {
@@ -23,9 +21,42 @@ CHINESE_NUMBERS = {
     '百': 100, '佰': 100, '千': 1000, '仟': 1000, '万': 10000, '萬': 10000,
 }
 
+# 罗马数字映射
+ROMAN_VALUES = {'I': 1, 'V': 5, 'X': 10, 'L': 50, 'C': 100, 'D': 500, 'M': 1000}
+
 # 常见的卷号关键词
 VOLUME_KEYWORDS = ['卷', '冊', '册', '部', '篇', '集', '季', '期', '话', '回']
 
+# 去除卷号后书名末尾需要清理的分隔字符
+TITLE_TAIL_CHARS = ' -_·・'
+
+# 卷号中可能出现的数字字符（中文数字、阿拉伯数字、罗马数字）
+VOLUME_DIGITS = r'零一二三四五六七八九十百千万壹贰叁肆伍陆柒捌玖拾佰仟萬\d'
+ROMAN_DIGITS = 'IVXLCDM'
+VOLUME_KEYWORD_CLASS = '[' + ''.join(VOLUME_KEYWORDS) + ']'
+
+# 预编译的正则表达式
+# 长度>=2的连续词语字符（\w 已包含中文字符）
+WORD_RE = re.compile(r'\w{2,}')
+ROMAN_NUMERAL_RE = re.compile(r'^[IVXLCDM]+$')
+
+# 模式1: 第X卷、第X册等
+VOLUME_ORDINAL_RE = re.compile(
+    rf'第([{VOLUME_DIGITS}{ROMAN_DIGITS}]+){VOLUME_KEYWORD_CLASS}(.*?)$'
+)
+# 模式2: 书名 X、书名-X、书名_X 等结尾形式
+# 合并为一个正则只扫描一次，每个分支只有一个分组，用 lastindex 取卷号
+# 各分支要么互斥，要么靠前的分支起点更靠左，结果与按顺序逐个尝试一致
+VOLUME_TAIL_RE = re.compile('|'.join((
+    rf'[-_\s]+([{VOLUME_DIGITS}{ROMAN_DIGITS}]+){VOLUME_KEYWORD_CLASS}?$',
+    rf'[（\(]([{VOLUME_DIGITS}{ROMAN_DIGITS}]+){VOLUME_KEYWORD_CLASS}?[）\)]$',
+    rf'[【〔]([{VOLUME_DIGITS}{ROMAN_DIGITS}]+){VOLUME_KEYWORD_CLASS}?[】〕]$',
+    rf'v([{VOLUME_DIGITS}]+)$',
+    rf'第([{VOLUME_DIGITS}]+)部分$',
+)), re.IGNORECASE)
+# 模式3: 纯数字在末尾
+TRAILING_NUMBER_RE = re.compile(r'(\d+)$')
+
 
 def extract_base_title(titles: List[str]) -> str:
     """
@@ -57,17 +88,19 @@ def extract_base_title(titles: List[str]) -> str:
         return simplified_titles[0]
     
     # 3. 尝试找到最长公共前缀
-    common_prefix = os.path.commonprefix(simplified_titles)
+    common_prefix = find_common_prefix(simplified_titles)
     if len(common_prefix) >= 3:
         # 确保公共前缀以完整词语结束
         common_prefix = trim_to_word_boundary(common_prefix)
         if len(common_prefix) >= 3:
             return common_prefix
     
-    # 4. 使用最长公共子序列（LCS）算法找到更精确的公共部分
-    lcs_result = find_longest_common_subsequence(simplified_titles)
-    if lcs_result and len(lcs_result) >= 5:
-        return lcs_result
+    # 4. 寻找所有标题共有的最长连续子串
+    common_substring = find_longest_common_substring(simplified_titles)
+    if common_substring:
+        common_substring = common_substring.strip()
+        if len(common_substring) >= 5:
+            return common_substring
     
     # 5. 使用词频统计找到共同词语
     common_words = find_common_words(simplified_titles)
@@ -76,12 +109,29 @@ def extract_base_title(titles: List[str]) -> str:
     
     # 6. 如果所有方法都失败，返回出现频率最高的简化标题
     if simplified_titles:
-        counter = Counter(simplified_titles)
-        return counter.most_common(1)[0][0]
+        # 按首次出现顺序遍历去重后的标题，次数相同时取最先出现的
+        return max(dict.fromkeys(simplified_titles), key=simplified_titles.count)
     
     return titles[0] if titles else ""
 
 
+def find_common_prefix(strings: List[str]) -> str:
+    """
+    寻找所有字符串的最长公共前缀
+    
+    按字典序最小和最大的两个字符串界定了其余所有字符串，
+    只需比较这两个字符串即可
+    """
+    if not strings:
+        return ""
+    
+    first, last = min(strings), max(strings)
+    for i, char in enumerate(first):
+        if char != last[i]:
+            return first[:i]
+    return first
+
+
 def trim_to_word_boundary(text: str) -> str:
     """修剪文本到最近的词语边界"""
     # 中文字符和常见标点
@@ -95,51 +145,46 @@ def trim_to_word_boundary(text: str) -> str:
     return text
 
 
-def find_longest_common_subsequence(titles: List[str]) -> Optional[str]:
-    """寻找最长公共子序列"""
+def find_longest_common_substring(titles: List[str], min_length: int = 5) -> Optional[str]:
+    """
+    寻找所有标题共有的最长连续子串
+    
+    Args:
+        titles: 标题列表
+        min_length: 子串的最小长度
+        
+    Returns:
+        最长公共子串，不足最小长度时返回None
+    """
     if not titles:
         return None
     
-    # 使用第一个标题作为基准
     base = titles[0]
-    lcs = base
-    
-    for title in titles[1:]:
-        lcs = longest_common_subsequence(lcs, title)
-        if not lcs:
-            return None
-    
-    return lcs if len(lcs) >= 5 else None
-
-
-def longest_common_subsequence(s1: str, s2: str) -> str:
-    """动态规划寻找两个字符串的最长公共子序列"""
-    m, n = len(s1), len(s2)
-    dp = [[0] * (n + 1) for _ in range(m + 1)]
-    
-    # 填充dp表
-    for i in range(1, m + 1):
-        for j in range(1, n + 1):
-            if s1[i-1] == s2[j-1]:
-                dp[i][j] = dp[i-1][j-1] + 1
-            else:
-                dp[i][j] = max(dp[i-1][j], dp[i][j-1])
-    
-    # 回溯构建LCS
-    i, j = m, n
-    lcs_chars = []
-    
-    while i > 0 and j > 0:
-        if s1[i-1] == s2[j-1]:
-            lcs_chars.append(s1[i-1])
-            i -= 1
-            j -= 1
-        elif dp[i-1][j] > dp[i][j-1]:
-            i -= 1
+    others = titles[1:]
+    
+    def common_substring(length):
+        """返回第一个长度为 length 的公共子串，没有则返回None"""
+        candidates = {base[i:i + length] for i in range(len(base) - length + 1)}
+        for title in others:
+            candidates &= {title[i:i + length] for i in range(len(title) - length + 1)}
+            if not candidates:
+                return None
+        # 取在第一个标题中最先出现的子串，保证结果稳定
+        return min(candidates, key=base.find)
+    
+    # 存在长度为 L 的公共子串时必然存在更短的，可对长度二分查找
+    best = None
+    low, high = min_length, min(len(title) for title in titles)
+    while low <= high:
+        length = (low + high) // 2
+        found = common_substring(length)
+        if found is None:
+            high = length - 1
         else:
-            j -= 1
+            best = found
+            low = length + 1
     
-    return ''.join(reversed(lcs_chars))
+    return best
 
 
 def find_common_words(titles: List[str]) -> List[str]:
@@ -147,22 +192,20 @@ def find_common_words(titles: List[str]) -> List[str]:
     if not titles:
         return []
     
-    # 分割词语（中文不需要空格分割，但可以按长度分割）
-    words_sets = []
-    for title in titles:
-        # 按非中文字符分割
-        words = re.split(r'[^\u4e00-\u9fff\w]+', title)
-        words = [w for w in words if len(w) >= 2]  # 只保留长度>=2的词语
-        words_sets.append(set(words))
+    # 直接匹配长度>=2的词语，等价于按非词语字符分割后过滤短词
+    findall = WORD_RE.findall
+    common_words = set(findall(titles[0]))
     
-    # 找出共同词语
-    common_words = set(words_sets[0])
-    for word_set in words_sets[1:]:
-        common_words &= word_set
+    # 逐个标题求交集，交集为空时剩余标题无需再分词
+    for title in titles[1:]:
+        if not common_words:
+            return []
+        common_words &= set(findall(title))
     
     return sorted(common_words, key=len, reverse=True)
 
 
+@lru_cache(maxsize=4096)
 def extract_volume_with_context(title: str) -> Tuple[Optional[str], Optional[int]]:
     """
     从书名中提取卷号，并返回去除卷号后的书名
@@ -176,39 +219,29 @@ def extract_volume_with_context(title: str) -> Tuple[Optional[str], Optional[int
     original_title = title
     
     # 模式1: 第X卷、第X册等
-    pattern1 = r'第([零一二三四五六七八九十百千万壹贰叁肆伍陆柒捌玖拾佰仟萬\dIVXLCDM]+)[卷冊册部篇集季期话回](.*?)$'
-    match = re.search(pattern1, title)
+    match = VOLUME_ORDINAL_RE.search(title)
     if match:
         volume_str = match.group(1)
         suffix = match.group(2) or ''
         volume = parse_volume_number(volume_str)
         if volume is not None:
-            base_title = title[:match.start()].rstrip(' -_·・')
+            base_title = title[:match.start()].rstrip(TITLE_TAIL_CHARS)
             return base_title, volume
     
     # 模式2: 书名 X、书名-X、书名_X
-    patterns = [
-        r'[-_\s]+([零一二三四五六七八九十百千万壹贰叁肆伍陆柒捌玖拾佰仟萬\dIVXLCDM]+)[卷冊册部篇集季期话回]?$',
-        r'[（\(]([零一二三四五六七八九十百千万壹贰叁肆伍陆柒捌玖拾佰仟萬\dIVXLCDM]+)[卷冊册部篇集季期话回]?[）\)]$',
-        r'[【〔]([零一二三四五六七八九十百千万壹贰叁肆伍陆柒捌玖拾佰仟萬\dIVXLCDM]+)[卷冊册部篇集季期话回]?[】〕]$',
-        r'v([零一二三四五六七八九十百千万壹贰叁肆伍陆柒捌玖拾佰仟萬\d]+)$',
-        r'第([零一二三四五六七八九十百千万壹贰叁肆伍陆柒捌玖拾佰仟萬\d]+)部分$',
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, title, re.IGNORECASE)
-        if match:
-            volume_str = match.group(1)
-            volume = parse_volume_number(volume_str)
-            if volume is not None:
-                base_title = title[:match.start()].rstrip(' -_·・')
-                return base_title, volume
+    match = VOLUME_TAIL_RE.search(title)
+    if match:
+        volume_str = match.group(match.lastindex)
+        volume = parse_volume_number(volume_str)
+        if volume is not None:
+            base_title = title[:match.start()].rstrip(TITLE_TAIL_CHARS)
+            return base_title, volume
     
     # 模式3: 纯数字在末尾
-    match = re.search(r'(\d+)$', title)
+    match = TRAILING_NUMBER_RE.search(title)
     if match and len(match.group(1)) <= 4:  # 避免年份被误识别
         volume = int(match.group(1))
-        base_title = title[:match.start()].rstrip(' -_·・')
+        base_title = title[:match.start()].rstrip(TITLE_TAIL_CHARS)
         return base_title, volume
     
     # 如果没有找到卷号，返回原始标题和None
@@ -228,7 +261,7 @@ def parse_volume_number(volume_str: str) -> Optional[int]:
         return int(volume_str)
     
     # 2. 如果是罗马数字
-    roman_match = re.match(r'^[IVXLCDM]+$', volume_str.upper())
+    roman_match = ROMAN_NUMERAL_RE.match(volume_str.upper())
     if roman_match:
         try:
             return roman_to_int(roman_match.group())
@@ -249,43 +282,41 @@ def chinese_to_int(chinese_num: str) -> int:
     if not chinese_num:
         return 0
     
+    numbers = CHINESE_NUMBERS
+    
+    # 处理一些特殊情况，如"十一"、"二十"等，整体命中时无需逐字解析
+    exact = numbers.get(chinese_num)
+    if exact is not None:
+        return exact
+    
     # 如果是简体中文数字字符串
     result = 0
     temp = 0
-    last_unit = 1
     
     for char in chinese_num:
-        if char in CHINESE_NUMBERS:
-            num = CHINESE_NUMBERS[char]
-            if num >= 10:  # 这是单位（十、百、千、万）
-                if temp == 0:
-                    temp = 1
-                result += temp * num
-                temp = 0
-                last_unit = num
-            else:  # 这是数字（零到九）
-                temp = num
-        else:
+        num = numbers.get(char)
+        if num is None:
             # 非中文数字字符，中断解析
             break
+        if num >= 10:  # 这是单位（十、百、千、万）
+            if temp == 0:
+                temp = 1
+            result += temp * num
+            temp = 0
+        else:  # 这是数字（零到九）
+            temp = num
     
-    result += temp
-    
-    # 处理一些特殊情况，如"十一"、"二十"等
-    if chinese_num in CHINESE_NUMBERS:
-        return CHINESE_NUMBERS[chinese_num]
-    
-    return result
+    return result + temp
 
 
 def roman_to_int(roman: str) -> int:
     """将罗马数字转换为整数"""
-    roman_dict = {'I': 1, 'V': 5, 'X': 10, 'L': 50, 'C': 100, 'D': 500, 'M': 1000}
+    get_value = ROMAN_VALUES.get
     result = 0
     prev_value = 0
     
     for char in reversed(roman.upper()):
-        value = roman_dict.get(char, 0)
+        value = get_value(char, 0)
         if value < prev_value:
             result -= value
         else:
@@ -318,6 +349,7 @@ def format_volume(volume: int, format_type: str = 'number') -> str:
         return str(volume)
 
 
+@lru_cache(maxsize=None)
 def int_to_chinese(num: int) -> str:
     """将整数转换为中文数字"""
     if num <= 0:
@@ -347,155 +379,164 @@ def int_to_chinese(num: int) -> str:
         return str(num)
 
 
-def get_all_authors(books: List) -> List[str]:
+def build_volume_suffixes(count: int, volume_format: str = 'number') -> List[str]:
+    """
+    一次性生成第 1 到 count 本书的卷号后缀
+    
+    Args:
+        count: 书籍数量
+        volume_format: 卷号格式，可选 'number'（按总数补零的数字）或 'chinese'（第X卷）
+        
+    Returns:
+        卷号后缀列表
+    """
+    if volume_format == 'chinese':
+        return [f"第{int_to_chinese(i)}卷" for i in range(1, count + 1)]
+    digits = max(1, len(str(count)))
+    return [f"{i:0{digits}d}" for i in range(1, count + 1)]
+
+
+def build_new_titles(new_title_base: str, count: int,
+                     volume_format: str = 'number') -> List[str]:
+    """
+    一次性生成第 1 到 count 本书的新书名（书名基础 + 卷号后缀，不添加空格）
+    
+    Args:
+        new_title_base: 新的书名基础
+        count: 书籍数量
+        volume_format: 卷号格式
+        
+    Returns:
+        新书名列表
+    """
+    return [new_title_base + suffix
+            for suffix in build_volume_suffixes(count, volume_format)]
+
+
+def get_all_authors(books: List[Tuple[str, List[str]]]) -> List[str]:
     """
     从书籍列表中提取所有作者
     
     Args:
-        books: 书籍元数据对象列表
+        books: (书名, 作者列表) 列表
         
     Returns:
-        去重并排序后的作者列表
+        去重后的作者列表，按在书籍中首次出现的顺序排列
     """
-    authors = set()
-    for book in books:
-        if hasattr(book, 'authors') and book.authors:
-            for author in book.authors:
-                # 清理作者名
-                clean_author = author.strip()
-                if clean_author:
-                    authors.add(clean_author)
-    return sorted(authors)
-
-def batch_update_metadata(db, book_ids: List[int], new_title_base: str, author: str, 
-                         clear_tags: bool = True, clear_series: bool = True, 
+    # dict.fromkeys 去重的同时保留首次出现的顺序
+    authors = dict.fromkeys(
+        author.strip()
+        for _, authors in books
+        for author in (authors or ())
+    )
+    # 去掉清理后为空的作者名
+    authors.pop('', None)
+    return list(authors)
+
+
+def bulk_update_metadata(db, book_ids: List[int], new_title_base: str, author: str,
+                         clear_tags: bool = True, clear_series: bool = True,
                          clear_publisher: bool = True, volume_format: str = 'number') -> int:
     """
-    批量更新书籍元数据 - 避免对象共享的终极版本
+    通过 new_api.set_field 批量更新书籍元数据
+    
+    每个字段只提交一次，未涉及的字段保持不变
+    
+    Args:
+        db: Calibre数据库对象
+        book_ids: 书籍ID列表（已排好序）
+        new_title_base: 新的书名基础
+        author: 统一的作者名，为空时保留原作者
+        clear_tags: 是否清空标签
+        clear_series: 是否清空丛书
+        clear_publisher: 是否清空出版方
+        volume_format: 卷号格式
+        
+    Returns:
+        更新的书籍数量
     """
-    updated_count = 0
+    if not book_ids:
+        return 0
     
-    for i, book_id in enumerate(book_ids, 1):
-        try:
-            # **关键：每次循环都重新建立数据库连接**
-            # 使用 index_is_id=True 确保正确获取
-            mi = db.get_metadata(book_id, index_is_id=True, get_cover=False)
-            
-            if not mi:
-                print(f"警告: ID={book_id} 的元数据为空")
-                continue
-            
-            print(f"处理 {i}/{len(book_ids)}: ID={book_id}")
-            
-            # 构建新书名
-            if volume_format == 'chinese':
-                volume_suffix = f"第{int_to_chinese(i)}卷"
-            else:
-                total_books = len(book_ids)
-                digits = 1 if total_books < 10 else 2 if total_books < 100 else 3
-                volume_suffix = f"{i:0{digits}d}"
-            
-            new_title = f"{new_title_base}{volume_suffix}"
-            
-            # **创建新的元数据对象（正确的方法）**
-            from calibre.ebooks.metadata.book.base import Metadata
-            new_mi = Metadata(new_title)
-            
-            # 1. 作者处理
-            if author and author.strip():
-                new_mi.authors = [author.strip()]
-                new_mi.sort_authors = [author.strip()]
-            else:
-                # 保留原作者
-                if hasattr(mi, 'authors'):
-                    new_mi.authors = list(mi.authors)
-                if hasattr(mi, 'sort_authors'):
-                    new_mi.sort_authors = list(mi.sort_authors)
-            
-            # 2. 排序标题处理 - 保留原排序标题或使用新标题
-            if hasattr(mi, 'sort_title') and mi.sort_title:
-                new_mi.sort_title = mi.sort_title
-            else:
-                new_mi.sort_title = new_title
-            
-            # 3. 其他字段
-            if hasattr(mi, 'comments'):
-                new_mi.comments = mi.comments
-            
-            # 4. 清空选项
-            if clear_tags:
-                new_mi.tags = []
-            else:
-                new_mi.tags = list(mi.tags)
-            
-            if clear_series:
-                # 清空丛书
-                new_mi.series = ""
-                new_mi.series_index = ""
-            else:
-                new_mi.series = mi.series
-                new_mi.series_index = mi.series_index
-            
-            if clear_publisher:
-                new_mi.publisher = mi.publisher
-            else:
-                # 清空出版方
-                new_mi.publisher = ""
-            
-            # 5. 复制其他重要字段
-            for attr in ['identifiers', 'languages', 'pubdate', 'timestamp',
-                        'last_modified', 'rating']:
-                if hasattr(mi, attr):
-                    value = getattr(mi, attr)
-                    if isinstance(value, (list, tuple)):
-                        setattr(new_mi, attr, list(value))
-                    else:
-                        setattr(new_mi, attr, value)
-            
-            # **关键：使用正确的 set_metadata 方法**
-            db.set_metadata(book_id, new_mi, force_changes=True)
-            updated_count += 1
-            
-            print(f"成功: {new_title}")
-            
-        except Exception as e:
-            print(f"失败 ID={book_id}: {e}")
-            import traceback
-            traceback.print_exc()
-    
-    return updated_count
+    new_api = db.new_api
+    
+    # 构建新书名
+    new_titles = build_new_titles(new_title_base, len(book_ids), volume_format)
+    titles = dict(zip(book_ids, new_titles))
+    new_api.set_field('title', titles)
+    
+    # 作者处理，为空时保留原作者
+    author = author.strip() if author else ''
+    if author:
+        new_api.set_field('authors', {book_id: [author] for book_id in book_ids})
+        author_sort = new_api.author_sort_from_authors([author])
+        new_api.set_field('author_sort', {book_id: author_sort for book_id in book_ids})
+    
+    # 清空选项
+    if clear_tags:
+        new_api.set_field('tags', {book_id: () for book_id in book_ids})
+    
+    if clear_series:
+        new_api.set_field('series', {book_id: '' for book_id in book_ids})
+        new_api.set_field('series_index', {book_id: 1.0 for book_id in book_ids})
+    
+    if clear_publisher:
+        new_api.set_field('publisher', {book_id: '' for book_id in book_ids})
+    
+    return len(titles)
 
-# 辅助函数：智能卷号检测和排序
-def detect_and_sort_books_by_volume(db, book_ids: List[int]) -> List[Tuple[int, int]]:
+
+def load_book_view(db, book_ids: List[int]) -> Dict[str, List]:
     """
-    检测书籍的卷号并排序
+    一次性读取书籍的书名、作者和卷号
+    
+    每个字段只查询一次数据库，结果以并列列表的形式返回，
+    供排序、预览等后续步骤共用
     
     Args:
         db: Calibre数据库对象
         book_ids: 书籍ID列表
         
     Returns:
-        排序后的(book_id, volume_number)列表
+        包含 'ids'、'titles'、'authors'、'volumes' 四个并列列表的字典，
+        保持 book_ids 的顺序，没有书名的书籍会被跳过
     """
-    books_with_volume = []
+    new_api = db.new_api
+    titles = new_api.all_field_for('title', book_ids, default_value=None)
+    authors = new_api.all_field_for('authors', book_ids, default_value=())
     
+    view = {'ids': [], 'titles': [], 'authors': [], 'volumes': []}
     for book_id in book_ids:
-        try:
-            mi = db.get_metadata(book_id, index_is_id=True, get_cover=False)
-            if mi and hasattr(mi, 'title'):
-                _, volume = extract_volume_with_context(mi.title)
-                books_with_volume.append((book_id, volume or 0))
-        except:
-            books_with_volume.append((book_id, 0))
+        title = titles.get(book_id)
+        if not title:
+            continue
+        _, volume = extract_volume_with_context(title)
+        view['ids'].append(book_id)
+        view['titles'].append(title)
+        view['authors'].append(list(authors.get(book_id) or ()))
+        view['volumes'].append(volume or 0)
+    return view
+
+
+# 辅助函数：智能卷号检测和排序
+def detect_and_sort_books_by_volume(view: Dict[str, List]) -> List[int]:
+    """
+    按卷号对书籍排序
     
-    # 按卷号排序
-    books_with_volume.sort(key=lambda x: x[1])
-    return books_with_volume
+    Args:
+        view: load_book_view 返回的书籍数据
+        
+    Returns:
+        按卷号排序后的下标列表，卷号相同的保持原始顺序
+    """
+    volumes = view['volumes']
+    return sorted(range(len(volumes)), key=volumes.__getitem__)
 
 
 # 新增功能：预览更新结果
 def preview_metadata_changes(db, book_ids: List[int], new_title_base: str, 
-                           author: str, volume_format: str = 'number') -> List[Dict]:
+                           author: str, volume_format: str = 'number', *,
+                           cached_metadata: Optional[Dict] = None) -> List[Dict]:
     """
     预览元数据更改，而不实际修改数据库
     
@@ -505,46 +546,35 @@ def preview_metadata_changes(db, book_ids: List[int], new_title_base: str,
         new_title_base: 新的书名基础
         author: 统一的作者名
         volume_format: 卷号格式
+        cached_metadata: 已读取的 (书名, 作者列表)，key 为书籍ID；其中的书籍不再查询数据库
         
     Returns:
         预览结果列表，包含新旧标题对比
     """
     previews = []
     
+    # 未缓存的书籍按字段一次性读取书名和作者
+    loaded = dict(cached_metadata) if cached_metadata else {}
+    missing_ids = [book_id for book_id in book_ids if book_id not in loaded]
+    if missing_ids:
+        view = load_book_view(db, missing_ids)
+        loaded.update(zip(view['ids'], zip(view['titles'], view['authors'])))
+    
     # 直接使用传入的book_ids（已在GUI中排好序）
-    books_data = []
-    for book_id in book_ids:
-        try:
-            mi = db.get_metadata(book_id, index_is_id=True, get_cover=False)
-            if mi:
-                _, volume = extract_volume_with_context(mi.title)
-                books_data.append({
-                    'id': book_id,
-                    'mi': mi,
-                    'volume': volume
-                })
-        except:
-            continue
+    books_data = [
+        (book_id,) + loaded[book_id]
+        for book_id in book_ids
+        if book_id in loaded
+    ]
     
     # 生成预览
-    for i, book_data in enumerate(books_data, 1):
-        mi = book_data['mi']
-        
-        # 构建新标题（不添加空格）
-        if volume_format == 'chinese':
-            volume_suffix = f"第{int_to_chinese(i)}卷"
-        else:
-            total_books = len(books_data)
-            digits = math.ceil(math.log10(total_books + 1))
-            volume_suffix = f"{i:0{digits}d}"
-        
-        new_title = f"{new_title_base}{volume_suffix}"
-        
+    new_titles = build_new_titles(new_title_base, len(books_data), volume_format)
+    for i, (book_id, title, old_authors) in enumerate(books_data, 1):
         previews.append({
-            'book_id': book_data['id'],
-            'old_title': mi.title,
-            'new_title': new_title,
-            'old_authors': mi.authors if hasattr(mi, 'authors') else [],
+            'book_id': book_id,
+            'old_title': title,
+            'new_title': new_titles[i-1],
+            'old_authors': list(old_authors or ()),
             'new_author': author,
             'index': i
         })